@@ -1,132 +1,159 @@
+import httpx
 import pytest
-from fastapi.testclient import TestClient
-from unittest.mock import Mock, MagicMock, patch
-import sys
-import os
+from unittest.mock import Mock, MagicMock
+
+from models import Course, CourseChunk, Lesson
+from rag_system import RAGSystem
+from session_manager import SessionManager
+
+
+# Canned mock configurations, built once at import and applied to fresh mocks
+# via configure_mock(). Copying a pre-built Mock is not an option: copy.copy()
+# shares child mocks with the original, so per-test tweaks would leak.
+_CONFIG_DEFAULTS = {
+    "ANTHROPIC_API_KEY": "test-api-key",
+    "ANTHROPIC_MODEL": "claude-sonnet-4-20250514",
+    "EMBEDDING_MODEL": "all-MiniLM-L6-v2",
+    "CHUNK_SIZE": 800,
+    "CHUNK_OVERLAP": 100,
+    "MAX_RESULTS": 5,
+    "MAX_HISTORY": 2,
+}
+
+_RAG_SYSTEM_DEFAULTS = {
+    "session_manager.create_session.return_value": "test-session-123",
+    "query.return_value": (
+        "This is a test answer about the course material.",
+        ["Course: Test Course, Lesson 1, Chunk 0", "Course: Test Course, Lesson 2, Chunk 1"]
+    ),
+    "get_course_analytics.return_value": {
+        "total_courses": 2,
+        "course_titles": ["Introduction to Python", "Advanced FastAPI"]
+    },
+    "add_course_folder.return_value": (2, 50),
+}
+
+_VECTOR_STORE_DEFAULTS = {
+    "get_course_count.return_value": 2,
+    "get_existing_course_titles.return_value": ["Course 1", "Course 2"],
+    "search_course_content.return_value": [
+        ("Sample content chunk 1", {"course_title": "Course 1", "lesson_number": 1}),
+        ("Sample content chunk 2", {"course_title": "Course 1", "lesson_number": 2})
+    ],
+}
+
+_SESSION_MANAGER_DEFAULTS = {
+    "create_session.return_value": "test-session-abc",
+    "get_conversation_history.return_value": "User: Previous question\nAssistant: Previous answer",
+    "add_exchange.return_value": None,
+}
+
+_AI_GENERATOR_DEFAULTS = {
+    "generate_response.return_value": "This is a generated AI response.",
+}
+
+# Parsed course document returned by the mock DocumentProcessor
+_TEST_COURSE = Course(
+    title="Test Course",
+    course_link="https://test.com/course",
+    instructor="Test Instructor",
+    lessons=[
+        Lesson(lesson_number=1, title="Introduction", lesson_link="https://test.com/lesson1")
+    ]
+)
+
+_TEST_CHUNKS = [
+    CourseChunk(
+        content="Test content chunk 1",
+        course_title="Test Course",
+        lesson_number=1,
+        chunk_index=0
+    )
+]
+
 
-# Add backend directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+@pytest.fixture(scope="session")
+def test_chroma_path(tmp_path_factory):
+    """Temporary ChromaDB directory, created once and cleaned up by pytest"""
+    return tmp_path_factory.mktemp("chroma")
 
 
 @pytest.fixture
-def mock_config():
+def mock_config(test_chroma_path):
     """Mock configuration for tests"""
-    config = Mock()
-    config.ANTHROPIC_API_KEY = "test-api-key"
-    config.ANTHROPIC_MODEL = "claude-sonnet-4-20250514"
-    config.EMBEDDING_MODEL = "all-MiniLM-L6-v2"
-    config.CHUNK_SIZE = 800
-    config.CHUNK_OVERLAP = 100
-    config.MAX_RESULTS = 5
-    config.MAX_HISTORY = 2
-    config.CHROMA_PATH = "./test_chroma_db"
-    return config
+    return Mock(**_CONFIG_DEFAULTS, CHROMA_PATH=str(test_chroma_path))
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_rag_system():
-    """Mock RAGSystem for testing API endpoints"""
-    rag_system = Mock()
-
-    # Mock session manager
-    rag_system.session_manager = Mock()
-    rag_system.session_manager.create_session.return_value = "test-session-123"
-
-    # Mock query method
-    rag_system.query.return_value = (
-        "This is a test answer about the course material.",
-        ["Course: Test Course, Lesson 1, Chunk 0", "Course: Test Course, Lesson 2, Chunk 1"]
-    )
-
-    # Mock get_course_analytics method
-    rag_system.get_course_analytics.return_value = {
-        "total_courses": 2,
-        "course_titles": ["Introduction to Python", "Advanced FastAPI"]
-    }
+    """Mock RAGSystem for testing API endpoints, shared across the session"""
+    # session_manager is an instance attribute, so it is not part of the class spec
+    # and has to be attached explicitly; that rules out spec_set on the outer mock
+    session_manager = Mock(spec_set=SessionManager)
+    return Mock(spec=RAGSystem, session_manager=session_manager, **_RAG_SYSTEM_DEFAULTS)
 
-    # Mock add_course_folder method
-    rag_system.add_course_folder.return_value = (2, 50)
 
-    return rag_system
+@pytest.fixture(autouse=True)
+def reset_mock_rag_system(mock_rag_system):
+    """Restore the shared RAGSystem mock to its defaults after each test"""
+    yield
+    mock_rag_system.reset_mock(return_value=True, side_effect=True)
+    mock_rag_system.configure_mock(**_RAG_SYSTEM_DEFAULTS)
 
 
 @pytest.fixture
 def mock_vector_store():
     """Mock VectorStore for testing"""
-    vector_store = Mock()
-    vector_store.get_course_count.return_value = 2
-    vector_store.get_existing_course_titles.return_value = ["Course 1", "Course 2"]
-    vector_store.search_course_content.return_value = [
-        ("Sample content chunk 1", {"course_title": "Course 1", "lesson_number": 1}),
-        ("Sample content chunk 2", {"course_title": "Course 1", "lesson_number": 2})
-    ]
-    return vector_store
+    return Mock(**_VECTOR_STORE_DEFAULTS)
 
 
 @pytest.fixture
 def mock_session_manager():
     """Mock SessionManager for testing"""
-    session_manager = Mock()
-    session_manager.create_session.return_value = "test-session-abc"
-    session_manager.get_conversation_history.return_value = "User: Previous question\nAssistant: Previous answer"
-    session_manager.add_exchange.return_value = None
-    return session_manager
+    return Mock(**_SESSION_MANAGER_DEFAULTS)
 
 
 @pytest.fixture
 def mock_ai_generator():
     """Mock AIGenerator for testing"""
-    ai_generator = Mock()
-    ai_generator.generate_response.return_value = "This is a generated AI response."
-    return ai_generator
+    return Mock(**_AI_GENERATOR_DEFAULTS)
 
 
 @pytest.fixture
 def mock_document_processor():
     """Mock DocumentProcessor for testing"""
-    from models import Course, Lesson, CourseChunk
-
     processor = Mock()
+    processor.process_course_document.return_value = (_TEST_COURSE, _TEST_CHUNKS)
+    return processor
 
-    # Create a mock course
-    course = Course(
-        title="Test Course",
-        link="https://test.com/course",
-        instructor="Test Instructor",
-        lessons=[
-            Lesson(lesson_number=1, lesson_title="Introduction", lesson_link="https://test.com/lesson1")
-        ]
-    )
-
-    # Create mock chunks
-    chunks = [
-        CourseChunk(
-            content="Test content chunk 1",
-            course_title="Test Course",
-            lesson_number=1,
-            chunk_index=0
-        )
-    ]
 
-    processor.process_course_document.return_value = (course, chunks)
-    return processor
+@pytest.fixture(scope="session")
+def app(mock_rag_system):
+    """FastAPI application with mocked RAGSystem, shared across the session"""
+    import app as app_module
 
+    # Override the rag_system in the app module for the whole session
+    original_rag_system = app_module.rag_system
+    app_module.rag_system = mock_rag_system
+    try:
+        yield app_module.app
+    finally:
+        app_module.rag_system = original_rag_system
 
-@pytest.fixture
-def client(mock_rag_system):
-    """FastAPI test client with mocked RAGSystem"""
-    with patch('app.RAGSystem') as mock_rag_class:
-        mock_rag_class.return_value = mock_rag_system
 
-        # Import app after patching
-        from app import app
+@pytest.fixture(scope="session")
+async def async_client(app):
+    """Async HTTP client calling the app in-process over ASGI, shared across the session"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
 
-        # Override the rag_system in the app module
-        import app as app_module
-        app_module.rag_system = mock_rag_system
 
-        with TestClient(app) as test_client:
-            yield test_client
+@pytest.fixture(scope="session")
+async def openapi_schema(async_client):
+    """OpenAPI schema served by the app, fetched once per session"""
+    response = await async_client.get("/openapi.json")
+    return response.json()
 
 
 @pytest.fixture
@@ -144,17 +171,3 @@ Lesson 2: Variables and Data Types
 Lesson Link: https://example.com/python/lesson2
 In this lesson, we learn about variables and different data types in Python.
 """
-
-
-@pytest.fixture(autouse=True)
-def cleanup_test_db():
-    """Cleanup test database after each test"""
-    yield
-    # Cleanup code here if needed
-    test_db_path = "./test_chroma_db"
-    if os.path.exists(test_db_path):
-        import shutil
-        try:
-            shutil.rmtree(test_db_path)
-        except Exception:
-            pass
@@ -1,15 +1,21 @@
+import asyncio
+
 import pytest
 from unittest.mock import patch, Mock, MagicMock
 from fastapi import status
 
+# Large mocked RAG output, built once at import
+_LARGE_ANSWER = "a" * 10000
+_MANY_SOURCES = tuple(f"Source {i}" for i in range(100))
+
 
 class TestEndToEndQueryFlow:
     """End-to-end tests for the complete query flow"""
 
-    def test_complete_query_flow_new_user(self, client, mock_rag_system):
+    async def test_complete_query_flow_new_user(self, async_client, mock_rag_system):
         """Test complete flow: new user asks question, gets answer with sources"""
         # Step 1: New user asks first question
-        response1 = client.post(
+        response1 = await async_client.post(
             "/api/query",
             json={"query": "What is Python?"}
         )
@@ -31,7 +37,7 @@ class TestEndToEndQueryFlow:
             ["Course: Python, Lesson 3"]
         )
 
-        response2 = client.post(
+        response2 = await async_client.post(
             "/api/query",
             json={
                 "query": "Can you tell me more?",
@@ -46,10 +52,10 @@ class TestEndToEndQueryFlow:
         assert data2["session_id"] == session_id
         assert data2["answer"] == "This is a follow-up answer."
 
-    def test_multiple_concurrent_sessions(self, client, mock_rag_system):
+    async def test_multiple_concurrent_sessions(self, async_client, mock_rag_system):
         """Test multiple users can have separate concurrent sessions"""
         # User 1 starts a session
-        response1 = client.post(
+        response1 = await async_client.post(
             "/api/query",
             json={"query": "What is FastAPI?"}
         )
@@ -58,7 +64,7 @@ class TestEndToEndQueryFlow:
         # User 2 starts a different session
         mock_rag_system.session_manager.create_session.return_value = "different-session"
 
-        response2 = client.post(
+        response2 = await async_client.post(
             "/api/query",
             json={"query": "What is Django?"}
         )
@@ -67,10 +73,10 @@ class TestEndToEndQueryFlow:
         # Sessions should be different
         assert session1 != session2
 
-    def test_query_to_courses_workflow(self, client, mock_rag_system):
+    async def test_query_to_courses_workflow(self, async_client, mock_rag_system):
         """Test workflow: user queries courses, then asks questions about them"""
         # Step 1: Check available courses
-        response1 = client.get("/api/courses")
+        response1 = await async_client.get("/api/courses")
         assert response1.status_code == status.HTTP_200_OK
 
         courses_data = response1.json()
@@ -78,7 +84,7 @@ class TestEndToEndQueryFlow:
 
         # Step 2: Ask question about one of the courses
         course_title = courses_data["course_titles"][0]
-        response2 = client.post(
+        response2 = await async_client.post(
             "/api/query",
             json={"query": f"Tell me about {course_title}"}
         )
@@ -90,12 +96,12 @@ class TestEndToEndQueryFlow:
 class TestErrorHandlingIntegration:
     """Integration tests for error handling across components"""
 
-    def test_graceful_degradation_on_rag_failure(self, client, mock_rag_system):
+    async def test_graceful_degradation_on_rag_failure(self, async_client, mock_rag_system):
         """Test system handles RAG system failures gracefully"""
         # Simulate RAG system failure
         mock_rag_system.query.side_effect = Exception("Vector store connection failed")
 
-        response = client.post(
+        response = await async_client.post(
             "/api/query",
             json={"query": "What is Python?"}
         )
@@ -104,47 +110,52 @@ class TestErrorHandlingIntegration:
         assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
         assert "detail" in response.json()
 
-    def test_error_handling_maintains_session(self, client, mock_rag_system):
+    async def test_error_handling_maintains_session(self, async_client, mock_rag_system):
         """Test that errors don't corrupt session state"""
+        # Succeed, fail transiently, then recover on the same session
+        mock_rag_system.query.side_effect = [
+            ("First answer", []),
+            Exception("Temporary failure"),
+            ("Recovery answer", []),
+        ]
+
         # First successful query
-        response1 = client.post(
+        response1 = await async_client.post(
             "/api/query",
             json={"query": "What is Python?"}
         )
         session_id = response1.json()["session_id"]
 
         # Second query fails
-        mock_rag_system.query.side_effect = Exception("Temporary failure")
-        response2 = client.post(
+        response2 = await async_client.post(
             "/api/query",
             json={"query": "Tell me more", "session_id": session_id}
         )
         assert response2.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
 
         # Third query should work with same session
-        mock_rag_system.query.side_effect = None
-        mock_rag_system.query.return_value = ("Recovery answer", [])
-
-        response3 = client.post(
+        response3 = await async_client.post(
             "/api/query",
             json={"query": "New question", "session_id": session_id}
         )
 
         assert response3.status_code == status.HTTP_200_OK
-        assert response3.json()["session_id"] == session_id
+        data3 = response3.json()
+        assert data3["session_id"] == session_id
+        assert data3["answer"] == "Recovery answer"
 
 
 class TestConversationContext:
     """Tests for conversation context and history management"""
 
-    def test_conversation_history_maintained(self, client, mock_rag_system):
+    async def test_conversation_history_maintained(self, async_client, mock_rag_system):
         """Test that conversation history is maintained across queries"""
         # Mock session manager to track history
         mock_session_manager = mock_rag_system.session_manager
         mock_session_manager.get_conversation_history.return_value = ""
 
         # First query
-        response1 = client.post(
+        response1 = await async_client.post(
             "/api/query",
             json={"query": "What is Python?"}
         )
@@ -155,7 +166,7 @@ class TestConversationContext:
             "User: What is Python?\nAssistant: Python is a programming language."
         )
 
-        response2 = client.post(
+        response2 = await async_client.post(
             "/api/query",
             json={"query": "Can you explain more?", "session_id": session_id}
         )
@@ -165,9 +176,9 @@ class TestConversationContext:
         # Verify RAG system was called with the session
         assert mock_rag_system.query.call_count >= 2
 
-    def test_new_session_has_no_history(self, client, mock_rag_system):
+    async def test_new_session_has_no_history(self, async_client, mock_rag_system):
         """Test that new sessions start with empty history"""
-        response = client.post(
+        response = await async_client.post(
             "/api/query",
             json={"query": "What is Python?"}
         )
@@ -181,7 +192,7 @@ class TestConversationContext:
 class TestSourceTracking:
     """Tests for source tracking and citation"""
 
-    def test_sources_returned_with_answer(self, client, mock_rag_system):
+    async def test_sources_returned_with_answer(self, async_client, mock_rag_system):
         """Test that sources are properly returned with answers"""
         mock_rag_system.query.return_value = (
             "Python is a programming language.",
@@ -191,7 +202,7 @@ class TestSourceTracking:
             ]
         )
 
-        response = client.post(
+        response = await async_client.post(
             "/api/query",
             json={"query": "What is Python?"}
         )
@@ -200,14 +211,14 @@ class TestSourceTracking:
         assert len(data["sources"]) == 2
         assert "Introduction to Python" in data["sources"][0]
 
-    def test_no_sources_for_general_knowledge(self, client, mock_rag_system):
+    async def test_no_sources_for_general_knowledge(self, async_client, mock_rag_system):
         """Test that queries not requiring course materials have empty sources"""
         mock_rag_system.query.return_value = (
             "General knowledge answer",
             []
         )
 
-        response = client.post(
+        response = await async_client.post(
             "/api/query",
             json={"query": "What is 2+2?"}
         )
@@ -219,21 +230,21 @@ class TestSourceTracking:
 class TestCourseManagement:
     """Integration tests for course management"""
 
-    def test_course_statistics_accuracy(self, client, mock_rag_system):
+    async def test_course_statistics_accuracy(self, async_client, mock_rag_system):
         """Test that course statistics are accurate"""
         mock_rag_system.get_course_analytics.return_value = {
             "total_courses": 3,
             "course_titles": ["Course A", "Course B", "Course C"]
         }
 
-        response = client.get("/api/courses")
+        response = await async_client.get("/api/courses")
         data = response.json()
 
         assert data["total_courses"] == 3
         assert len(data["course_titles"]) == 3
         assert data["total_courses"] == len(data["course_titles"])
 
-    def test_course_count_updates(self, client, mock_rag_system):
+    async def test_course_count_updates(self, async_client, mock_rag_system):
         """Test that course count can change over time"""
         # Initial state
         mock_rag_system.get_course_analytics.return_value = {
@@ -241,7 +252,7 @@ class TestCourseManagement:
             "course_titles": ["Course A", "Course B"]
         }
 
-        response1 = client.get("/api/courses")
+        response1 = await async_client.get("/api/courses")
         assert response1.json()["total_courses"] == 2
 
         # After adding more courses
@@ -250,120 +261,102 @@ class TestCourseManagement:
             "course_titles": ["Course A", "Course B", "Course C", "Course D"]
         }
 
-        response2 = client.get("/api/courses")
+        response2 = await async_client.get("/api/courses")
         assert response2.json()["total_courses"] == 4
 
 
 class TestAPIPerformance:
     """Tests for API performance and limits"""
 
-    def test_concurrent_requests_handling(self, client, mock_rag_system):
+    async def test_concurrent_requests_handling(self, async_client, mock_rag_system):
         """Test API can handle multiple concurrent requests"""
-        # Simulate multiple concurrent requests
-        responses = []
-        for i in range(10):
-            response = client.post(
-                "/api/query",
-                json={"query": f"Question {i}"}
-            )
-            responses.append(response)
+        queries = [f"Question {i}" for i in range(10)]
+        mock_rag_system.session_manager.create_session.side_effect = [
+            f"session-{i}" for i in range(len(queries))
+        ]
+
+        # Dispatch all requests at once on the event loop
+        responses = await asyncio.gather(*(
+            async_client.post("/api/query", json={"query": query}) for query in queries
+        ))
 
         # All requests should succeed
         assert all(r.status_code == status.HTTP_200_OK for r in responses)
 
-        # Each should have unique sessions
-        session_ids = [r.json()["session_id"] for r in responses]
-        # Note: With mocking, they might be the same. In real scenario, they'd be unique.
+        # Each should have its own session and reach the RAG system once
+        session_ids = {r.json()["session_id"] for r in responses}
+        assert len(session_ids) == len(queries)
+        assert sorted(c.args[0] for c in mock_rag_system.query.call_args_list) == sorted(queries)
 
-    def test_large_response_handling(self, client, mock_rag_system):
+    async def test_large_response_handling(self, async_client, mock_rag_system):
         """Test API can handle large responses"""
-        large_answer = "a" * 10000
-        large_sources = [f"Source {i}" for i in range(100)]
-
-        mock_rag_system.query.return_value = (large_answer, large_sources)
+        mock_rag_system.query.return_value = (_LARGE_ANSWER, list(_MANY_SOURCES))
 
-        response = client.post(
+        response = await async_client.post(
             "/api/query",
             json={"query": "Give me detailed information"}
         )
 
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
-        assert len(data["answer"]) == 10000
-        assert len(data["sources"]) == 100
+        assert len(data["answer"]) == len(_LARGE_ANSWER)
+        assert len(data["sources"]) == len(_MANY_SOURCES)
 
 
+@pytest.mark.framework
 class TestCORSIntegration:
     """Integration tests for CORS functionality"""
 
-    def test_cors_allows_frontend_requests(self, client):
-        """Test CORS allows requests from frontend origins"""
-        response = client.post(
-            "/api/query",
-            json={"query": "test"},
-            headers={"Origin": "http://localhost:8000"}
-        )
+    @pytest.mark.parametrize("method, path, kwargs, origin", [
+        pytest.param("POST", "/api/query", {"json": {"query": "test"}}, "http://localhost:8000", id="query"),
+        pytest.param("GET", "/api/courses", {}, "http://localhost:3000", id="courses"),
+    ])
+    async def test_cors_allows_frontend_requests(self, async_client, method, path, kwargs, origin):
+        """Test CORS headers are present on API responses to frontend origins"""
+        response = await async_client.request(method, path, headers={"Origin": origin}, **kwargs)
 
         assert response.status_code == status.HTTP_200_OK
         # CORS headers should be present
         assert "access-control-allow-origin" in response.headers
 
-    def test_cors_headers_on_all_endpoints(self, client):
-        """Test CORS headers are present on all endpoints"""
-        # Query endpoint
-        response1 = client.post(
-            "/api/query",
-            json={"query": "test"},
-            headers={"Origin": "http://localhost:3000"}
-        )
-        assert "access-control-allow-origin" in response1.headers
-
-        # Courses endpoint
-        response2 = client.get(
-            "/api/courses",
-            headers={"Origin": "http://localhost:3000"}
-        )
-        assert "access-control-allow-origin" in response2.headers
-
 
+@pytest.mark.framework
 class TestAPIVersioning:
     """Tests for API versioning and compatibility"""
 
-    def test_api_endpoints_use_api_prefix(self, client):
+    async def test_api_endpoints_use_api_prefix(self, async_client):
         """Test that all API endpoints use /api prefix"""
         # Query endpoint
-        response1 = client.post("/api/query", json={"query": "test"})
+        response1 = await async_client.post("/api/query", json={"query": "test"})
         assert response1.status_code != status.HTTP_404_NOT_FOUND
 
         # Courses endpoint
-        response2 = client.get("/api/courses")
+        response2 = await async_client.get("/api/courses")
         assert response2.status_code != status.HTTP_404_NOT_FOUND
 
-    def test_openapi_schema_version(self, client):
+    def test_openapi_schema_version(self, openapi_schema):
         """Test OpenAPI schema contains version information"""
-        response = client.get("/openapi.json")
-        schema = response.json()
-
-        assert "info" in schema
-        assert "version" in schema["info"]
+        assert "info" in openapi_schema
+        assert "version" in openapi_schema["info"]
 
 
+@pytest.mark.framework
 class TestStaticFileServing:
     """Tests for static file serving"""
 
-    def test_static_files_served(self, client):
+    async def test_static_files_served(self, async_client):
         """Test that static files are served correctly"""
         # Root should serve frontend
-        response = client.get("/")
+        response = await async_client.get("/")
 
         # Should either return HTML or 404 if file doesn't exist
         assert response.status_code in [status.HTTP_200_OK, status.HTTP_404_NOT_FOUND]
 
-    def test_api_routes_take_precedence(self, client):
+    async def test_api_routes_take_precedence(self, async_client):
         """Test that API routes take precedence over static files"""
         # API routes should work even if static files exist
-        response = client.post("/api/query", json={"query": "test"})
+        response = await async_client.post("/api/query", json={"query": "test"})
         assert response.status_code == status.HTTP_200_OK
 
-        response = client.get("/api/courses")
+        response = await async_client.get("/api/courses")
         assert response.status_code == status.HTTP_200_OK
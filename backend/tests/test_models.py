@@ -1,13 +1,23 @@
 import pytest
-from pydantic import ValidationError
-import sys
-import os
+from pydantic import TypeAdapter, ValidationError
 
-# Add backend directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    # orjson ships with chromadb; fall back to the stdlib parser without it
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 from app import QueryRequest, QueryResponse, CourseStats
 
+# Validators built once for the tests that construct many models from raw data
+_QUERY_REQUEST = TypeAdapter(QueryRequest)
+_QUERY_RESPONSE = TypeAdapter(QueryResponse)
+_COURSE_STATS = TypeAdapter(CourseStats)
+
+# Large inputs, built once and shared by the size tests
+_LONG_TEXT = "a" * 10000
+_MANY_SOURCES = tuple(f"Source {i}" for i in range(100))
+
 
 class TestQueryRequest:
     """Tests for QueryRequest model validation"""
@@ -34,28 +44,20 @@ class TestQueryRequest:
         request = QueryRequest(query="")
         assert request.query == ""
 
-    def test_query_request_missing_query(self):
-        """Test QueryRequest raises error when query is missing"""
-        with pytest.raises(ValidationError) as exc_info:
-            QueryRequest()
-
-        assert "query" in str(exc_info.value)
-
-    def test_query_request_invalid_query_type(self):
-        """Test QueryRequest raises error for non-string query"""
-        with pytest.raises(ValidationError):
-            QueryRequest(query=123)
-
-    def test_query_request_invalid_session_type(self):
-        """Test QueryRequest raises error for non-string session_id"""
+    @pytest.mark.parametrize("kwargs", [
+        {},
+        {"query": 123},
+        {"query": "test", "session_id": 456},
+    ], ids=["missing_query", "invalid_query_type", "invalid_session_type"])
+    def test_query_request_invalid(self, kwargs):
+        """Test QueryRequest rejects missing or mistyped fields"""
         with pytest.raises(ValidationError):
-            QueryRequest(query="test", session_id=456)
+            _QUERY_REQUEST.validate_python(kwargs)
 
     def test_query_request_with_long_query(self):
         """Test QueryRequest handles very long query strings"""
-        long_query = "a" * 10000
-        request = QueryRequest(query=long_query)
-        assert len(request.query) == 10000
+        request = _QUERY_REQUEST.validate_python({"query": _LONG_TEXT})
+        assert len(request.query) == len(_LONG_TEXT)
 
     def test_query_request_with_unicode(self):
         """Test QueryRequest handles unicode characters"""
@@ -106,40 +108,23 @@ class TestQueryResponse:
         assert response.answer == "General knowledge answer"
         assert response.sources == []
 
-    def test_query_response_missing_required_fields(self):
-        """Test QueryResponse raises error when required fields missing"""
-        with pytest.raises(ValidationError):
-            QueryResponse(answer="test")
-
-        with pytest.raises(ValidationError):
-            QueryResponse(sources=[], session_id="123")
-
-    def test_query_response_invalid_sources_type(self):
-        """Test QueryResponse raises error for non-list sources"""
-        with pytest.raises(ValidationError):
-            QueryResponse(
-                answer="test",
-                sources="not a list",
-                session_id="123"
-            )
-
-    def test_query_response_invalid_answer_type(self):
-        """Test QueryResponse raises error for non-string answer"""
-        with pytest.raises(ValidationError):
-            QueryResponse(
-                answer=123,
-                sources=[],
-                session_id="123"
-            )
-
-    def test_query_response_sources_with_non_strings(self):
-        """Test QueryResponse raises error for non-string items in sources"""
+    @pytest.mark.parametrize("kwargs", [
+        {"answer": "test"},
+        {"sources": [], "session_id": "123"},
+        {"answer": "test", "sources": "not a list", "session_id": "123"},
+        {"answer": 123, "sources": [], "session_id": "123"},
+        {"answer": "test", "sources": ["valid", 123, "another"], "session_id": "123"},
+    ], ids=[
+        "missing_sources_and_session",
+        "missing_answer",
+        "invalid_sources_type",
+        "invalid_answer_type",
+        "sources_with_non_strings",
+    ])
+    def test_query_response_invalid(self, kwargs):
+        """Test QueryResponse rejects missing or mistyped fields"""
         with pytest.raises(ValidationError):
-            QueryResponse(
-                answer="test",
-                sources=["valid", 123, "another"],
-                session_id="123"
-            )
+            _QUERY_RESPONSE.validate_python(kwargs)
 
     def test_query_response_serialization(self):
         """Test QueryResponse can be serialized to JSON"""
@@ -156,25 +141,19 @@ class TestQueryResponse:
 
     def test_query_response_with_long_answer(self):
         """Test QueryResponse handles long answer strings"""
-        long_answer = "a" * 10000
-        response = QueryResponse(
-            answer=long_answer,
-            sources=[],
-            session_id="test"
+        response = _QUERY_RESPONSE.validate_python(
+            {"answer": _LONG_TEXT, "sources": [], "session_id": "test"}
         )
 
-        assert len(response.answer) == 10000
+        assert len(response.answer) == len(_LONG_TEXT)
 
     def test_query_response_with_many_sources(self):
         """Test QueryResponse handles many sources"""
-        sources = [f"Source {i}" for i in range(100)]
-        response = QueryResponse(
-            answer="test",
-            sources=sources,
-            session_id="test"
+        response = _QUERY_RESPONSE.validate_python(
+            {"answer": "test", "sources": list(_MANY_SOURCES), "session_id": "test"}
         )
 
-        assert len(response.sources) == 100
+        assert len(response.sources) == len(_MANY_SOURCES)
 
 
 class TestCourseStats:
@@ -200,37 +179,23 @@ class TestCourseStats:
         assert stats.total_courses == 0
         assert stats.course_titles == []
 
-    def test_course_stats_missing_fields(self):
-        """Test CourseStats raises error when fields are missing"""
-        with pytest.raises(ValidationError):
-            CourseStats(total_courses=5)
-
-        with pytest.raises(ValidationError):
-            CourseStats(course_titles=["Course 1"])
-
-    def test_course_stats_invalid_total_type(self):
-        """Test CourseStats raises error for non-integer total_courses"""
-        with pytest.raises(ValidationError):
-            CourseStats(
-                total_courses="five",
-                course_titles=["Course 1"]
-            )
-
-    def test_course_stats_invalid_titles_type(self):
-        """Test CourseStats raises error for non-list course_titles"""
+    @pytest.mark.parametrize("kwargs", [
+        {"total_courses": 5},
+        {"course_titles": ["Course 1"]},
+        {"total_courses": "five", "course_titles": ["Course 1"]},
+        {"total_courses": 1, "course_titles": "Course 1"},
+        {"total_courses": 3, "course_titles": ["Course 1", 123, "Course 3"]},
+    ], ids=[
+        "missing_titles",
+        "missing_total",
+        "invalid_total_type",
+        "invalid_titles_type",
+        "titles_with_non_strings",
+    ])
+    def test_course_stats_invalid(self, kwargs):
+        """Test CourseStats rejects missing or mistyped fields"""
         with pytest.raises(ValidationError):
-            CourseStats(
-                total_courses=1,
-                course_titles="Course 1"
-            )
-
-    def test_course_stats_titles_with_non_strings(self):
-        """Test CourseStats raises error for non-string titles"""
-        with pytest.raises(ValidationError):
-            CourseStats(
-                total_courses=3,
-                course_titles=["Course 1", 123, "Course 3"]
-            )
+            _COURSE_STATS.validate_python(kwargs)
 
     def test_course_stats_negative_total(self):
         """Test CourseStats with negative total_courses"""
@@ -296,22 +261,17 @@ class TestModelInteroperability:
 
     def test_models_json_compatibility(self):
         """Test all models can be converted to/from JSON"""
-        import json
-
         # QueryRequest
         request = QueryRequest(query="test")
-        request_json = json.dumps(request.model_dump())
-        assert json.loads(request_json)["query"] == "test"
+        assert json_loads(request.model_dump_json())["query"] == "test"
 
         # QueryResponse
         response = QueryResponse(answer="answer", sources=[], session_id="123")
-        response_json = json.dumps(response.model_dump())
-        assert json.loads(response_json)["answer"] == "answer"
+        assert json_loads(response.model_dump_json())["answer"] == "answer"
 
         # CourseStats
         stats = CourseStats(total_courses=1, course_titles=["Course 1"])
-        stats_json = json.dumps(stats.model_dump())
-        assert json.loads(stats_json)["total_courses"] == 1
+        assert json_loads(stats.model_dump_json())["total_courses"] == 1
 
     def test_model_defaults(self):
         """Test model default values"""